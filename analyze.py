@@ -16,7 +16,11 @@ The most important functionalities include functions to
 """
 
 from datetime import date, timedelta
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 
+import numpy as np
 import pandas as pd
 
 import db
@@ -44,9 +48,8 @@ def check_for_username(user):
     :param user: the user ('user.UserDB')
     :return: True if the user name already exists, false if not ('bool')
     """
-    user_df = create_data_frame(user.database, "HabitAppUser")
-    users = list(user_df["UserName"])
-    return True if user.username in users else False
+    username = user.database.execute("SELECT 1 FROM HabitAppUser WHERE UserName = ? LIMIT 1", [user.username])
+    return True if username.fetchone() else False
 
 
 def show_habit_data(user):
@@ -56,8 +59,8 @@ def show_habit_data(user):
     :return: a data frame containing only the user's habits and their data ('pandas.core.frame.DataFrame')
     """
     user_id = db.find_user_id(user)
-    habit_df = create_data_frame(user.database, "Habit")
-    return habit_df.loc[habit_df["FKUserID"] == user_id]
+    return pd.read_sql_query("""SELECT PKHabitID, FKUserID, Name, Periodicity, CreationTime FROM Habit
+    WHERE FKUserID = ? ORDER BY PKHabitID""", user.database, params=[user_id])
 
 
 def return_completions(habit):
@@ -66,10 +69,56 @@ def return_completions(habit):
     :param habit: the habit for which the completion dates are to be returned ('habit.HabitDB')
     :return: a list (list) containing all completion dates ('str') of the habit
     """
+    if habit._completions is not None:  # the completion dates were already loaded together with the habit
+        return habit._completions
     habit_id = db.find_habit_id(habit)
-    completions_df = create_data_frame(habit.database, "Completions")
-    habit_data = completions_df.loc[completions_df["FKHabitID"] == habit_id]
-    return habit_data["CompletionDate"].to_list()
+    completions = habit.database.execute("SELECT CompletionDate FROM Completions WHERE FKHabitID = ? "
+                                         "ORDER BY CompletionDate", [habit_id])
+    return [completion_date for (completion_date,) in completions]
+
+
+def return_last_completion(habit):
+    """return the date of a habit's most recent completion, which is determined by the database
+
+    :param habit: the habit for which the last completion date is to be returned ('habit.HabitDB')
+    :return: the last completion date ('str') of the habit or None if the habit has not been completed yet
+    """
+    if habit._completions is not None:  # the completion dates were already loaded together with the habit
+        return None if not habit._completions else habit._completions[-1]
+    habit_id = db.find_habit_id(habit)
+    return habit.database.execute("SELECT MAX(CompletionDate) FROM Completions WHERE FKHabitID = ?",
+                                  [habit_id]).fetchone()[0]
+
+
+def return_user_completions(user):
+    """return the completion dates of all of a user's habits, which are retrieved with a single query
+
+    :param user: the user for whose habits the completion dates are to be returned ('user.UserDB')
+    :return: a dictionary ('dict') with the habit ids ('int') as keys and sorted lists ('list') of the habits'
+    completion dates ('str') as values (the list is empty for habits that have not been completed yet)
+    """
+    user_id = db.find_user_id(user)
+    completions_df = pd.read_sql_query("""SELECT h.PKHabitID, c.CompletionDate FROM Habit h
+    LEFT JOIN Completions c ON h.PKHabitID = c.FKHabitID WHERE h.FKUserID = ?
+    ORDER BY h.PKHabitID, c.CompletionDate""", user.database, params=[user_id])
+    completion_dates = completions_df["CompletionDate"]
+    habit_rows = completions_df.groupby("PKHabitID", sort=False).indices  # the rows are already sorted by habit,
+    # so that each habit's rows form one contiguous block
+    return {int(habit_id): completion_dates.iloc[rows].dropna().to_list() for habit_id, rows in habit_rows.items()}
+
+
+def return_habits_completions(habits: list):
+    """return the completion dates of each of the habits. The completion dates that were loaded together with the
+    habits are used directly, those of the remaining habits are retrieved with a single query.
+
+    :param habits: a list ('list') of habits ('habit.HabitDB') of the same user
+    :return: a list ('list') containing the list of completion dates ('str') of each habit
+    """
+    if all(habit._completions is not None for habit in habits):
+        return [habit._completions for habit in habits]
+    user_completions = return_user_completions(habits[0].user)
+    return [habit._completions if habit._completions is not None else user_completions[db.find_habit_id(habit)]
+            for habit in habits]
 
 
 def return_ordered_periodicities(user):
@@ -79,7 +128,9 @@ def return_ordered_periodicities(user):
     :param user: the user for whom periodicities are to be returned ('user.UserDB')
     :return: a list (list) of the correctly ordered periodicities ('str')
     """
-    user_periodicities = (set([habit.periodicity for habit in user.defined_habits]))
+    user_id = db.find_user_id(user)
+    periodicities = user.database.execute("SELECT DISTINCT Periodicity FROM Habit WHERE FKUserID = ?", [user_id])
+    user_periodicities = {periodicity for (periodicity,) in periodicities}
     possible_periodicities = ["daily", "weekly", "monthly", "yearly"]  # to determine the order in the next step
     return [x for x in possible_periodicities if x in user_periodicities]
 
@@ -93,19 +144,11 @@ def return_habit_info(user, periodicity: str = None):
     :return: a data frame containing the name, periodicity and creation time of the desired habits
     ('pandas.core.frame.DataFrame')
     """
-    habit_info = show_habit_data(user)
-    if periodicity:
-        habit_info = habit_info.loc[habit_info["Periodicity"] == periodicity].reset_index()
-    return habit_info[["Name", "Periodicity", "CreationTime"]]
-
-
-def str_to_date(str_dates: list):
-    """convert a list of string dates into a list of datetime dates
-
-    :param str_dates: list ('list') of strings dates ('str')
-    :return: a list ('list') of datetime dates ('date')
-    """
-    return list(map(lambda x: date.fromisoformat(x), str_dates))
+    user_id = db.find_user_id(user)
+    query, params = "SELECT Name, Periodicity, CreationTime FROM Habit WHERE FKUserID = ?", [user_id]
+    if periodicity:  # the habits are filtered by the database instead of the data frame
+        query, params = query + " AND Periodicity = ?", params + [periodicity]
+    return pd.read_sql_query(query + " ORDER BY PKHabitID", user.database, params=params)
 
 
 def weekly_start(check_date):
@@ -139,26 +182,37 @@ def yearly_start(check_date):
     return date.fromisoformat(f"{check_date.year}-01-01")
 
 
+# functions to determine the period start of a single completion date ('date') for each periodicity
+PERIOD_START_FUNCS = {
+    "daily": (lambda x: x),
+    "weekly": weekly_start,
+    "monthly": monthly_start,
+    "yearly": yearly_start
+}
+
+# functions to determine the period starts of an array of completion dates ('numpy.ndarray') for each periodicity
+VECTORIZED_PERIOD_START_FUNCS = {
+    "daily": (lambda x: x),
+    "weekly": (lambda x: x - (x.astype(np.int64) + 3) % 7),  # subtract the weekday (01/01/1970 was a Thursday)
+    "monthly": (lambda x: x.astype("datetime64[M]").astype("datetime64[D]")),
+    "yearly": (lambda x: x.astype("datetime64[Y]").astype("datetime64[D]"))
+}
+
+
 def calculate_period_starts(periodicity: str, check_dates):
     """for each completion date of a habit, calculate the period start. The period start is defined as the
     date of the beginning of the period (i.e., every day for daily habits and every Monday for weekly habits etc.)
 
     :param periodicity: the habit's periodicity ('str')
     :param check_dates: a list ('list') of the habit's completion dates (dates: 'date' or 'str')
-    :return: a list ('list') of period starts ('date') - can contain duplicates
+    :return: an array ('numpy.ndarray') of period starts ('numpy.datetime64') - can contain duplicates
     """
-    if isinstance(check_dates[0], str):  # are dates already in date format?
-        check_dates = str_to_date(check_dates)
-    period_start_funcs = {
-        "daily": (lambda x: x),
-        "weekly": weekly_start,
-        "monthly": monthly_start,
-        "yearly": yearly_start
-    }
-    period_start_func = period_start_funcs[periodicity]  # determine the correct function to calculate period starts
-    return list(map(period_start_func, check_dates))  # calculate for each completion date the period start
+    check_dates = np.asarray(check_dates, dtype="datetime64[D]")  # also converts string dates
+    period_start_func = VECTORIZED_PERIOD_START_FUNCS[periodicity]  # determine the correct function
+    return period_start_func(check_dates)  # calculate the period starts of all completion dates at once
 
 
+@lru_cache(maxsize=32)  # the analysis repeatedly asks for the same periods (e.g., the current one) of each periodicity
 def calculate_one_period_start(periodicity: str, check_date):
     """calculate the beginning of the period in which a habit with the specified periodicity was completed
 
@@ -166,17 +220,24 @@ def calculate_one_period_start(periodicity: str, check_date):
     :param check_date: the date the habit was checked off ('date')
     :return: the start of the period ('date')
     """
-    period_start = calculate_period_starts(periodicity, [check_date])
-    return period_start[0]
+    return PERIOD_START_FUNCS[periodicity](check_date)
 
 
-def tidy_starts(period_starts: list):
-    """remove duplicates in the inserted list and sort its elements
+def tidy_starts(period_starts):
+    """remove duplicates in the inserted array and sort its elements
 
-    :param period_starts: a list ('list') of period starts ('date')
-    :return: a sorted list ('list') of period starts ('date') without duplicates
+    :param period_starts: an array ('numpy.ndarray') of period starts ('numpy.datetime64')
+    :return: a sorted array ('numpy.ndarray') of period starts ('numpy.datetime64') without duplicates
     """
-    return sorted(list(set(period_starts)))
+    return np.unique(period_starts)
+
+
+# the number of days that are allowed between two period starts for each periodicity so that the streak is not broken
+ALLOWED_DAYS = {"daily": 1,
+                "weekly": 7,
+                "monthly": 32,  # if a habit has not been completed in a month, the difference is at least 58 days
+                "yearly": 366
+                }
 
 
 def return_allowed_time(periodicity: str):
@@ -186,104 +247,116 @@ def return_allowed_time(periodicity: str):
     :param periodicity: the habit's periodicity ('str')
     :return: the allowed time difference ('timedelta')
     """
-    timeliness = {"daily": timedelta(days=1),
-                  "weekly": timedelta(days=7),
-                  "monthly": timedelta(days=32),  # if a habit has not been completed in a month, the timedelta is at
-                  # least 58 days
-                  "yearly": timedelta(days=366)
-                  }
-    return timeliness[periodicity]
+    return timedelta(days=ALLOWED_DAYS[periodicity])
 
 
-def add_future_period(tidy_period_starts: list, periodicity: str):
+def add_future_period(tidy_period_starts, periodicity: str):
     """add a future period to calculate streaks and breaks correctly
 
-    :param tidy_period_starts: the sorted list ('list') of period starts ('dates') without duplicates
+    :param tidy_period_starts: the sorted array ('numpy.ndarray') of period starts ('numpy.datetime64') without
+    duplicates
     :param periodicity: the habit's periodicity ('str')
-    :return: a list ('list') of period starts ('date') including the calculated future period
+    :return: an array ('numpy.ndarray') of period starts ('numpy.datetime64') including the calculated future period
     """
-    period_starts = tidy_period_starts  # to not change the actual list
     duration = return_allowed_time(periodicity)  # approximate duration of a period
     future_period = calculate_one_period_start(periodicity, date.today() + 2 * duration)  # calculate a future period
     # with at least one period distance to the current period
-    period_starts.append(future_period)
-    return period_starts
+    return np.append(tidy_period_starts, np.datetime64(future_period, "D"))
 
 
 # prepare for streak and break analysis
-def return_final_period_starts(habit):
+def return_final_period_starts(habit, check_dates: list = None):
     """prepare for streak and break analysis by performing all functions necessary to return a clean list of periods,
     in which the habit was performed at least once, including the future period to correctly calculate streaks and
     break indices.
 
     :param habit: the habit which is to be analyzed ('habit.HabitDB')
-    :return: a clean list ('list') of period starts ('date'), denoting the start of periods,
+    :param check_dates: the habit's completion dates ('list'), if they have already been retrieved (optional)
+    :return: a clean array ('numpy.ndarray') of period starts ('numpy.datetime64'), denoting the start of periods,
     in which the habit was performed at least once
     """
-    check_dates = return_completions(habit)
+    if check_dates is None:
+        check_dates = return_completions(habit)
     period_starts = calculate_period_starts(habit.periodicity, check_dates)
     tidy_periods = tidy_starts(period_starts)
     return add_future_period(tidy_periods, habit.periodicity)
 
 
-def calculate_element_diffs(final_periods: list):
-    """calculate the differences between two consecutive elements in a list
+def calculate_element_diffs(final_periods):
+    """calculate the differences between two consecutive elements in an array
 
-    :param final_periods: clean list ('list') of dates ('date') that correspond to the start
+    :param final_periods: clean array ('numpy.ndarray') of dates ('numpy.datetime64') that correspond to the start
      of the periods, in which the habit was checked off at least once, including one future period
-    :return: a list ('list') of differences ('timedelta') between two consecutive period starts
+    :return: an array ('numpy.ndarray') of differences ('numpy.timedelta64') between two consecutive period starts
     """
-    return [t - s for s, t in zip(final_periods, final_periods[1:])]
+    return np.diff(final_periods)
 
 
-def calculate_break_indices(final_periods: list, periodicity: str):
+def calculate_break_indices(final_periods, periodicity: str):
     """for the final periods, return the indices of the periods, after which a habit streak was broken
     (i.e., the indices after which a consecutive period is missing)
 
-    :param final_periods: clean list ('list') of dates ('date') that correspond to the start
+    :param final_periods: clean array ('numpy.ndarray') of dates ('numpy.datetime64') that correspond to the start
      of the periods, in which the habit was checked off at least once, including one future period
     :param periodicity: the habit's periodicity ('str')
-    :return: a list ('list') of the indices ('int') which indicate the break of a streak
+    :return: an array ('numpy.ndarray') of the indices ('int') which indicate the break of a streak
     """
-    diffs = calculate_element_diffs(final_periods)
-    allowed_time = return_allowed_time(periodicity)
-    return [index for index, value in enumerate(diffs) if value > allowed_time]
+    diffs = calculate_element_diffs(final_periods).astype(np.int64)  # differences in days
+    return np.flatnonzero(diffs > ALLOWED_DAYS[periodicity])
 
 
-def calculate_streak_lengths(habit):
+def calculate_streak_lengths(habit, final_periods=None):
     """for a habit, calculate the length of each streak (i.e., the number of consecutive periods in a row,
     in which the habit was completed at least once)
 
     :param habit: the habit for which the streak lengths are to be calculated ('habit.HabitDB')
-    :return: a list ('list') of the habit's streak lengths ('int')
+    :param final_periods: the habit's final period starts ('numpy.ndarray'), if they have already been determined
+    (optional)
+    :return: an array ('numpy.ndarray') of the habit's streak lengths ('int')
     """
-    final_periods = return_final_period_starts(habit)
+    if final_periods is None:
+        final_periods = return_final_period_starts(habit)
     break_indices = calculate_break_indices(final_periods, habit.periodicity)  # due to the added future period,
     # there is always at least one break index, even if no streak has been broken yet
-    streak_lengths = [-1]  # because otherwise the following calculation does not consider the first streak
-    streak_lengths[1:] = break_indices  # append the remaining break indices
+    streak_lengths = np.insert(break_indices, 0, -1)  # because otherwise the following calculation does not
+    # consider the first streak
     return calculate_element_diffs(streak_lengths)
 
 
-def calculate_longest_streak(habit):
+def calculate_longest_streak(habit, final_periods=None):
     """calculate the longest streak of a habit
 
     :param habit: the habit for which the longest streak is to be calculated ('habit.HabitDB')
+    :param final_periods: the habit's final period starts ('numpy.ndarray'), if they have already been determined
+    (optional)
     :return: the habit's longest streak ('int')
     """
-    streak_lengths = calculate_streak_lengths(habit)
-    return max(streak_lengths)
+    # the database calculates the streak directly, unless the completion dates were already loaded with the habit
+    if final_periods is None and habit._completions is None and db.WINDOW_FUNCTIONS_AVAILABLE:
+        return db.find_longest_streak(habit)
+    longest_streak, _, _ = calculate_streak_stats(habit, final_periods)
+    return longest_streak
 
 
 def habit_creator(user):
-    """create a list of the user's habits
+    """create a list of the user's habits. The habits' ids and completion dates are retrieved with the same query,
+    so that they do not have to be looked up for each habit later on.
 
     :param user: the user for whom the habit list is to be created ('user.UserDB')
     :return: a list ('list') of the user's habits ('habit.HabitDB')
     """
-    habit_data = show_habit_data(user)
-    names_and_periodicity = habit_data[["Name", "Periodicity"]].values.tolist()
-    return list(map(lambda x: hb.HabitDB(x[0], x[1], user), names_and_periodicity))
+    user_id = db.find_user_id(user)
+    habit_rows = user.database.execute("""SELECT h.PKHabitID, h.Name, h.Periodicity, c.CompletionDate
+    FROM Habit h LEFT JOIN Completions c ON c.FKHabitID = h.PKHabitID
+    WHERE h.FKUserID = ? ORDER BY h.PKHabitID, c.CompletionDate""", [user_id])
+    habits = []
+    for (habit_id, name, periodicity), rows in groupby(habit_rows, key=itemgetter(0, 1, 2)):
+        habit = hb.HabitDB(name, periodicity, user)
+        habit._habit_id = habit_id
+        habit._completions = [completion_date for (_, _, _, completion_date) in rows
+                              if completion_date is not None]  # habits without completions have one NULL row
+        habits.append(habit)
+    return habits
 
 
 def calculate_longest_streak_per_habit(completed_habits: list):
@@ -296,9 +369,13 @@ def calculate_longest_streak_per_habit(completed_habits: list):
     if len(completed_habits) == 0:
         return None
     else:
-        habit_names = [habit.name for habit in completed_habits]
-        longest_streaks = map(calculate_longest_streak, completed_habits)
-        return dict(zip(habit_names, longest_streaks))
+        if db.WINDOW_FUNCTIONS_AVAILABLE:  # the longest streaks of all habits are calculated by the database at once
+            longest_streaks = db.find_longest_streaks(completed_habits[0].user)
+            # habits that have not been completed yet are not part of the result
+            return {habit.name: longest_streaks.get(db.find_habit_id(habit), 0) for habit in completed_habits}
+        completions = return_habits_completions(completed_habits)
+        return {habit.name: calculate_longest_streak(habit, return_final_period_starts(habit, check_dates))
+                for habit, check_dates in zip(completed_habits, completions)}
 
 
 def calculate_longest_streak_of_all(completed_habits: list):
@@ -315,82 +392,112 @@ def calculate_longest_streak_of_all(completed_habits: list):
     if not longest_streaks:  # if none of the user's habits have been completed
         return None, None
     else:
-        longest_streak_of_all = longest_streaks[max(longest_streaks, key=longest_streaks.get)]
+        longest_streak_of_all = max(longest_streaks.values())
         best_habits = [key for (key, value) in longest_streaks.items() if value == longest_streak_of_all]  # it is
         # possible that two habits have the same longest streak. In this way, both habits are returned.
         return longest_streak_of_all, best_habits
 
 
-def completed_in_period(final_periods: list, periodicity: str, period: str):
+def completed_in_period(final_periods, periodicity: str, period: str):
     """check if the habit was completed in the specified period.
 
     :param period: the period to check for, either "current" or "previous" ('str')
-    :param final_periods: clean list ('list') of dates ('date') that correspond to the start
+    :param final_periods: clean array ('numpy.ndarray') of dates ('numpy.datetime64') that correspond to the start
      of the periods, in which the habit was checked off at least once, including one future period
     :param periodicity: the habit's periodicity ('str')
     :return: true if the list of final periods contains the previous period, false otherwise ('bool')
     """
     cur_period_start = calculate_one_period_start(periodicity, date.today())
     if period == "current":
-        return True if cur_period_start in final_periods else False
+        period_start = cur_period_start
     else:
-        prev_period_start = calculate_one_period_start(periodicity, cur_period_start - timedelta(days=1))
-        return True if prev_period_start in final_periods else False
+        period_start = calculate_one_period_start(periodicity, cur_period_start - timedelta(days=1))
+    index = np.searchsorted(final_periods, np.datetime64(period_start, "D"))  # binary search, since the final
+    # periods are sorted
+    return True if index < len(final_periods) and final_periods[index] == period_start else False
+
 
+def calculate_streak_stats(habit, final_periods=None):
+    """calculate a habit's longest streak, current streak and number of breaks together, so that the streak
+    lengths and the completions in the current and the previous period only have to be determined once
 
-def calculate_curr_streak(habit):
+    :param habit: the habit which is to be analyzed ('habit.HabitDB')
+    :param final_periods: the habit's final period starts ('numpy.ndarray'), if they have already been determined
+    (optional)
+    :return: a tuple ('tuple') containing the habit's longest streak ('int'), current streak ('int') and number of
+    breaks ('int')
+    """
+    if final_periods is None:
+        final_periods = return_final_period_starts(habit)
+    if len(final_periods) == 1:  # only the future period, i.e., the habit has not been completed yet
+        return 0, 0, 0
+    streak_lengths = calculate_streak_lengths(habit, final_periods)  # one streak length per break index
+    curr_period = completed_in_period(final_periods, habit.periodicity, "current")
+    prev_period = completed_in_period(final_periods, habit.periodicity, "previous")
+    longest_streak = int(streak_lengths.max())
+    # if a habit was not completed in the previous period, the current streak is either 0 (not completed in
+    # the current period) or 1 (completed in the current period)
+    if not prev_period:
+        current_streak = 0 if not curr_period else 1
+    else:
+        current_streak = int(streak_lengths[-1])
+    # if the habit was executed in the current or the previous period (since the user can then still complete
+    # the habit in the current period), there is one break less than elements in break indices due to the
+    # consideration of the future period
+    if curr_period or prev_period:  # for this reason, the break calculation only works for completion dates
+        # in the past or at the current date
+        break_no = len(streak_lengths) - 1
+    else:
+        break_no = len(streak_lengths)
+    return longest_streak, current_streak, break_no
+
+
+def calculate_curr_streak(habit, final_periods=None):
     """calculate the specified habit's current streak, i.e., the current number of consecutive periods in a row,
     in which the habit was completed at least once.
 
     :param habit: the habit ('habit.HabitDB'), for which the current streak is to be calculated
+    :param final_periods: the habit's final period starts ('numpy.ndarray'), if they have already been determined
+    (optional)
     :return: the current streak (i.e., the current number of consecutive periods in a row, in which the user has
     completed the habit at least once) ('int')
     """
-    final_periods = return_final_period_starts(habit)
-    # if a habit was not completed in the previous period, the current streak is either 0 (not completed in
-    # the current period) or 1 (completed in the current period)
-    if not completed_in_period(final_periods, habit.periodicity, "previous"):
-        return 0 if not completed_in_period(final_periods, habit.periodicity, "current") else 1
-    else:
-        streak_lengths = calculate_streak_lengths(habit)
-        return streak_lengths[-1]
+    _, current_streak, _ = calculate_streak_stats(habit, final_periods)
+    return current_streak
 
 
-def calculate_break_no(habit):
+def calculate_break_no(habit, final_periods=None):
     """calculate how often a habit's streaks were broken since the first completion
 
     :param habit: the habit which is to be analyzed ('habit.HabitDB')
+    :param final_periods: the habit's final period starts ('numpy.ndarray'), if they have already been determined
+    (optional)
     :return: the number of breaks ('int')
     """
-    final_periods = return_final_period_starts(habit)
-    break_indices = calculate_break_indices(final_periods, habit.periodicity)
-    # if the habit was executed in the current or the previous period (since the user can then still complete
-    # the habit in the current period), there is one break less than elements in break indices due to the
-    # consideration of the future period
-    curr_period = completed_in_period(final_periods, habit.periodicity, "current")
-    prev_period = completed_in_period(final_periods, habit.periodicity, "previous")
-    if curr_period or prev_period:  # for this reason, the break calculation only works for completion dates
-        # in the past or at the current date
-        return len(break_indices) - 1
-    else:
-        return len(break_indices)
+    _, _, break_no = calculate_streak_stats(habit, final_periods)
+    return break_no
 
 
-def calculate_completion_rate(habit):
+def calculate_completion_rate(habit, final_periods=None):
     """calculate a habit's completion rate during the last 28 days (daily habits)/4 full weeks (weekly habits).
     Completions in the current period are not counted. The completion rate is defined as the number of periods
     in which the habit was completed divided by the number of periods in which the habit was not
     completed during the last four weeks. It can only be calculated for daily or weekly habits.
 
     :param habit: the habit whose completion rate is to be calculated ('habit.HabitDB')
+    :param final_periods: the habit's final period starts ('numpy.ndarray'), if they have already been determined
+    (optional)
     :return: the habit's completion rate during the last four weeks ('float')
     """
-    final_periods = return_final_period_starts(habit)
+    if final_periods is None:
+        final_periods = return_final_period_starts(habit)
     no_possible_periods = 28 if habit.periodicity == "daily" else 4
     cur_period = calculate_one_period_start(habit.periodicity, date.today())
     period_4_weeks_ago = calculate_one_period_start(habit.periodicity, (cur_period - timedelta(weeks=4)))
-    completed_periods_4_weeks = list(filter(lambda x: period_4_weeks_ago <= x < cur_period, final_periods))
-    return len(completed_periods_4_weeks) / no_possible_periods
+    # since the final periods are sorted, the periods of the last four weeks lie between the two insertion points
+    first_index, cur_index = np.searchsorted(final_periods, np.array([period_4_weeks_ago, cur_period],
+                                                                     dtype="datetime64[D]"))
+    return int(cur_index - first_index) / no_possible_periods
 
 
 def calculate_completion_rate_per_habit(completed_habits: list):
@@ -402,9 +509,11 @@ def calculate_completion_rate_per_habit(completed_habits: list):
      completions rates ('float') as values
     """
     frequent_habits = [habit for habit in completed_habits if habit.periodicity in ("daily", "weekly")]
-    habit_names = [habit.name for habit in frequent_habits]
-    completion_rates = list(map(calculate_completion_rate, frequent_habits))
-    return dict(zip(habit_names, completion_rates))
+    if not frequent_habits:
+        return {}
+    completions = return_habits_completions(frequent_habits)
+    return {habit.name: calculate_completion_rate(habit, return_final_period_starts(habit, check_dates))
+            for habit, check_dates in zip(frequent_habits, completions)}
 
 
 def calculate_worst_completion_rate_of_all(completed_habits: list):
@@ -415,7 +524,9 @@ def calculate_worst_completion_rate_of_all(completed_habits: list):
     habit(s) ('str') that have the lowest completion rate(s)
     """
     completion_rates = calculate_completion_rate_per_habit(completed_habits)
-    lowest_completion_rate = completion_rates[min(completion_rates, key=completion_rates.get)]
+    lowest_completion_rate = min(completion_rates.values(), default=None)
+    if lowest_completion_rate is None:  # if none of the completed habits is a daily or weekly habit
+        return None, None
     worst_habits = [key for (key, value) in completion_rates.items() if value == lowest_completion_rate]  # it is
     # possible that two habits have the same completion rates. In this way, both are returned
     return lowest_completion_rate, worst_habits
@@ -427,9 +538,10 @@ def find_completed_habits(habit_list: list):
     :param habit_list: a list ('list') of habits ('habit.HabitDB')
     :return: a list ('list') of habits ('habit.HabitDB') that have been completed at least once
     """
-    check_dates = list(map(return_completions, habit_list))
-    habit_indices = [index for index, value in enumerate(check_dates) if len(value) > 0]
-    return [habit for index, habit in enumerate(habit_list) if index in habit_indices]
+    if all(habit._completions is not None for habit in habit_list):  # the completion dates were loaded already
+        return [habit for habit in habit_list if habit._completions]
+    completed_ids = db.find_completed_habit_ids(habit_list[0].user)  # one query for all habits
+    return [habit for habit in habit_list if db.find_habit_id(habit) in completed_ids]
 
 
 def analysis_index():
@@ -446,9 +558,9 @@ def analyze_all_habits(habit_list: list):
     """
     completed_habits = find_completed_habits(habit_list)
     habit_names = [habit.name for habit in completed_habits]
-    analysis_data = [habit.analyze_habit() for habit in completed_habits]
+    check_dates = return_habits_completions(completed_habits) if completed_habits else []
+    analysis_data = [habit.analyze_habit(dates) for habit, dates in zip(completed_habits, check_dates)]
     analysis_dict = dict(zip(habit_names, analysis_data))
-    pd.set_option("display.max_columns", None)  # to show all columns
     return pd.DataFrame(analysis_dict, index=analysis_index())
 
 
@@ -9,7 +9,46 @@ The most important functionalities include functions to
 
 import sqlite3
 from sqlite3 import Error
-from datetime import datetime
+from datetime import date, datetime
+from contextlib import contextmanager
+
+# the statements that are executed repeatedly, so that the single and the bulk functions share the same statement
+_SQL_INSERT_USER = "INSERT INTO HabitAppUser(UserName) VALUES (?)"
+_SQL_FIND_USER = "SELECT PKUserID FROM HabitAppUser WHERE UserName = ?"
+_SQL_INSERT_HABIT = "INSERT INTO Habit(FKUserID, Name, Periodicity, CreationTime) VALUES (?, ?, ?, ?)"
+_SQL_FIND_HABIT = "SELECT h.PKHabitID FROM Habit h JOIN HabitAppUser u ON h.FKUserID = u.PKUserID " \
+                  "WHERE h.Name = ? AND u.UserName = ?"
+_SQL_INSERT_COMPLETION = "INSERT INTO Completions(FKHabitID, CompletionDate, CompletionTime) VALUES (?, ?, ?)"
+# the consecutive dates are generated by a recursive query, so that they do not have to be calculated in Python
+_SQL_SEED_COMPLETIONS = """WITH RECURSIVE Days(CompletionDate, DayNo) AS (
+    VALUES (date(?), 1) UNION ALL SELECT date(CompletionDate, '+1 day'), DayNo + 1 FROM Days WHERE DayNo < ?)
+INSERT INTO Completions(FKHabitID, CompletionDate, CompletionTime) SELECT ?, CompletionDate, ? FROM Days"""
+_SQL_DELETE_HABIT = "DELETE FROM Habit WHERE PKHabitID == ?"
+_SQL_MODIFY_HABIT = "UPDATE Habit SET Name = COALESCE(?, Name), Periodicity = COALESCE(?, Periodicity) " \
+                    "WHERE PKHabitID == ?"
+
+# window functions (which are needed to calculate streaks in the database) are only available since SQLite 3.25
+WINDOW_FUNCTIONS_AVAILABLE = sqlite3.sqlite_version_info >= (3, 25, 0)
+
+# the longest streak of each habit is calculated by numbering the periods consecutively (days, weeks since the
+# first Monday of year 1, months and years) and grouping the completed periods into streaks: within a streak, the
+# difference between the period number and the row number of the completed period is constant
+_SQL_LONGEST_STREAKS = """WITH CompletedPeriods AS (
+    SELECT DISTINCT c.FKHabitID AS HabitID, CASE h.Periodicity
+        WHEN 'daily' THEN CAST(julianday(c.CompletionDate) AS INTEGER)
+        WHEN 'weekly' THEN CAST((julianday(c.CompletionDate) - julianday('0001-01-01')) / 7 AS INTEGER)
+        WHEN 'monthly' THEN CAST(strftime('%Y', c.CompletionDate) AS INTEGER) * 12
+                            + CAST(strftime('%m', c.CompletionDate) AS INTEGER)
+        WHEN 'yearly' THEN CAST(strftime('%Y', c.CompletionDate) AS INTEGER) END AS Period
+    FROM Completions c JOIN Habit h ON h.PKHabitID = c.FKHabitID WHERE {condition}),
+Streaks AS (
+    SELECT HabitID, COUNT(*) AS StreakLength FROM (
+        SELECT HabitID, Period - ROW_NUMBER() OVER (PARTITION BY HabitID ORDER BY Period) AS Streak
+        FROM CompletedPeriods)
+    GROUP BY HabitID, Streak)
+SELECT HabitID, MAX(StreakLength) FROM Streaks GROUP BY HabitID"""
+_SQL_LONGEST_STREAKS_OF_USER = _SQL_LONGEST_STREAKS.format(condition="h.FKUserID = ?")
+_SQL_LONGEST_STREAK_OF_HABIT = _SQL_LONGEST_STREAKS.format(condition="h.PKHabitID = ?")
 
 
 # create database structure and tables
@@ -20,11 +59,18 @@ def get_db(name: str):
     :return: a database connection to the sqlite database with the specified name ('sqlite3.connection')
     """
     try:
-        database = sqlite3.connect(name)
+        database = sqlite3.connect(name, cached_statements=256)  # keep more prepared statements for reuse
     except Error as e:
         print(e)
     else:
-        database.execute("PRAGMA foreign_keys = 1")  # otherwise, on delete cascade does not work
+        database.executescript("""
+        PRAGMA foreign_keys = 1;  -- otherwise, on delete cascade does not work
+        PRAGMA synchronous = NORMAL;  -- with WAL, the database only syncs at checkpoints
+        PRAGMA temp_store = MEMORY;  -- temporary tables and indices are kept in memory
+        PRAGMA cache_size = -64000;  -- allow a page cache of up to 64 MB
+        """)
+        if name != ":memory:":  # in-memory databases do not have a journal file
+            database.execute("PRAGMA journal_mode = WAL")  # commits append to a log instead of rewriting the database
         create_tables(database)
         return database
 
@@ -35,40 +81,62 @@ def create_tables(database):
 
     :param database: the database connection with which the tables are to be created ('sqlite3.connection')
     """
-    cursor = database.cursor()
+    database.executescript("""
+    -- create 'HabitAppUser' table
+    CREATE TABLE IF NOT EXISTS HabitAppUser
+    (PKUserID INTEGER PRIMARY KEY, UserName TEXT);
 
-    # create 'HabitAppUser' table
-    user_table = """CREATE TABLE IF NOT EXISTS HabitAppUser
-    (PKUserID INTEGER PRIMARY KEY, UserName TEXT)"""
-
-    cursor.execute(user_table)
-
-    # create 'Habit' table
-    habit_table = """CREATE TABLE IF NOT EXISTS Habit
+    -- create 'Habit' table
+    CREATE TABLE IF NOT EXISTS Habit
     (PKHabitID INTEGER PRIMARY KEY, FKUserID INTEGER, Name TEXT, Periodicity TEXT, CreationTime TIMESTAMP,
-    FOREIGN KEY(FKUserID) REFERENCES HabitAppUser(PKUserID) ON DELETE CASCADE ON UPDATE CASCADE)"""
-
-    cursor.execute(habit_table)
-
-    # create 'Completions' table
-    completions_table = """CREATE TABLE IF NOT EXISTS Completions
-    (PKCompletionsID INTEGER PRIMARY KEY, FKHabitID INTEGER, CompletionDate DATE, CompletionTime TIME, 
-    FOREIGN KEY(FKHabitID) REFERENCES Habit(PKHabitID) ON DELETE CASCADE ON UPDATE CASCADE)"""
-
-    cursor.execute(completions_table)
-
-    database.commit()
+    FOREIGN KEY(FKUserID) REFERENCES HabitAppUser(PKUserID) ON DELETE CASCADE ON UPDATE CASCADE);
+
+    -- create 'Completions' table
+    CREATE TABLE IF NOT EXISTS Completions
+    (PKCompletionsID INTEGER PRIMARY KEY, FKHabitID INTEGER, CompletionDate DATE, CompletionTime TIME,
+    FOREIGN KEY(FKHabitID) REFERENCES Habit(PKHabitID) ON DELETE CASCADE ON UPDATE CASCADE);
+
+    -- create an index on the foreign key, so that a habit's completions can be looked up without scanning the
+    -- whole table
+    CREATE INDEX IF NOT EXISTS idx_completion_habit ON Completions(FKHabitID);
+    """)  # the tables are created with a single call, which also commits them
+    # the unique indices ensure that usernames and a user's habit names cannot be stored twice and allow users and
+    # habits to be looked up quickly (the habit index also covers the lookup of a user's habits)
+    unique_indices = {"idx_username": "HabitAppUser(UserName)", "idx_habit_user_name": "Habit(FKUserID, Name)"}
+    for index, columns in unique_indices.items():
+        try:
+            database.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {index} ON {columns}")
+        except sqlite3.IntegrityError:  # databases created by earlier versions can already contain duplicates
+            database.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {columns}")
 
 
 # insert data into tables
-def add_user(user):
+def add_user(user, commit: bool = True):
     """store a new user in the 'HabitAppUser' table
 
     :param user: the user who is to be stored in the database ('user.UserDB')
+    :param commit: whether the change is to be committed immediately ('bool'). Pass False to commit several changes
+    at once, e.g., within an 'atomic' block.
     """
-    cursor = user.database.cursor()
-    cursor.execute("INSERT INTO HabitAppUser(UserName) VALUES (?)", [user.username])
-    user.database.commit()
+    cursor = user.database.execute(_SQL_INSERT_USER, [user.username])
+    if commit:
+        user.database.commit()
+    if not user.database.in_transaction:  # an id that has not been committed yet could be rolled back and reused
+        user._user_id = cursor.lastrowid  # the id does not change, so it does not have to be looked up again
+
+
+def add_users(users: list, commit: bool = True):
+    """store several new users in the 'HabitAppUser' table with a single statement
+
+    :param users: a list ('list') of the users who are to be stored in the database ('user.UserDB')
+    :param commit: whether the change is to be committed immediately ('bool'). Pass False to commit several changes
+    at once, e.g., within an 'atomic' block.
+    """
+    if len(users) == 0:
+        return
+    users[0].database.executemany(_SQL_INSERT_USER, [[user.username] for user in users])
+    if commit:
+        users[0].database.commit()
 
 
 def find_user_id(user):
@@ -77,25 +145,48 @@ def find_user_id(user):
     :param user: the user, whose user id is to be found ('user.UserDB')
     :return: the user's user id ('int')
     """
-    cursor = user.database.cursor()
-    cursor.execute("SELECT PKUserID FROM HabitAppUser WHERE UserName = ?", [user.username])
-    user_id = cursor.fetchone()
-    return user_id[0]
+    if user._user_id is not None:  # the id is only looked up if it is not yet known to the user object
+        return user._user_id
+    user_id = user.database.execute(_SQL_FIND_USER, [user.username]).fetchone()[0]
+    if not user.database.in_transaction:  # the id is only kept once it has been committed
+        user._user_id = user_id
+    return user_id
 
 
-def add_habit(habit, creation_datetime: str = None):
+def add_habit(habit, creation_datetime: str = None, commit: bool = True):
     """store a new habit in the 'Habit' table
 
     :param habit: the habit to store ('habit.HabitDB')
     :param creation_datetime: the datetime the habit was created ('str')
+    :param commit: whether the change is to be committed immediately ('bool'). Pass False to commit several changes
+    at once, e.g., within an 'atomic' block.
     """
-    cursor = habit.database.cursor()
     user_id = find_user_id(habit.user)
     if not creation_datetime:
         creation_datetime = str(datetime.now())
-    cursor.execute("INSERT INTO Habit(FKUserID, Name, Periodicity, CreationTime) VALUES (?, ?, ?, ?)",
-                   (user_id, habit.name, habit.periodicity, creation_datetime))
-    habit.database.commit()
+    cursor = habit.database.execute(_SQL_INSERT_HABIT, (user_id, habit.name, habit.periodicity, creation_datetime))
+    if commit:
+        habit.database.commit()
+    if not habit.database.in_transaction:  # an id that has not been committed yet could be rolled back and reused
+        habit._habit_id = cursor.lastrowid  # the id does not change, so it does not have to be looked up again
+
+
+def add_habits(habits: list, creation_datetime: str = None, commit: bool = True):
+    """store several new habits in the 'Habit' table with a single statement
+
+    :param habits: a list ('list') of the habits to store ('habit.HabitDB')
+    :param creation_datetime: the datetime the habits were created ('str')
+    :param commit: whether the change is to be committed immediately ('bool'). Pass False to commit several changes
+    at once, e.g., within an 'atomic' block.
+    """
+    if len(habits) == 0:
+        return
+    if not creation_datetime:
+        creation_datetime = str(datetime.now())
+    habit_rows = [(find_user_id(habit.user), habit.name, habit.periodicity, creation_datetime) for habit in habits]
+    habits[0].database.executemany(_SQL_INSERT_HABIT, habit_rows)
+    if commit:
+        habits[0].database.commit()
 
 
 def find_habit_id(habit):
@@ -104,55 +195,162 @@ def find_habit_id(habit):
     :param habit: the habit for which the id is to be found ('habit.HabitDB')
     :return: the habit's id ('int')
     """
-    cursor = habit.database.cursor()
-    user_id = find_user_id(habit.user)
-    cursor.execute("SELECT PKHabitID FROM Habit WHERE Name = ? AND FKUserID = ?",
-                   (habit.name, user_id))
-    habit_id = cursor.fetchone()
-    return habit_id[0]
+    if habit._habit_id is not None:  # the id is only looked up if it is not yet known to the habit object
+        return habit._habit_id
+    # the user is identified by the username in the same query, so that the user id does not have to be found first
+    habit_id = habit.database.execute(_SQL_FIND_HABIT, (habit.name, habit.user.username)).fetchone()[0]
+    if not habit.database.in_transaction:  # the id is only kept once it has been committed
+        habit._habit_id = habit_id
+    return habit_id
+
+
+def find_completed_habit_ids(user):
+    """find the ids of all of a user's habits that have been completed at least once
+
+    :param user: the user whose habits are to be checked ('user.UserDB')
+    :return: a set ('set') of the ids ('int') of the user's habits that have at least one completion
+    """
+    user_id = find_user_id(user)
+    # only the completions of the user's habits are considered, so that other users' data does not slow down the query
+    completed_ids = user.database.execute("""SELECT DISTINCT c.FKHabitID FROM Completions c
+    JOIN Habit h ON h.PKHabitID = c.FKHabitID WHERE h.FKUserID = ?""", [user_id])
+    return {habit_id for (habit_id,) in completed_ids}
+
 
+def _split_check_datetime(check_datetime: str = None):
+    """split the datetime when a habit was checked off into the completion date and the completion time
 
-def add_completion(habit, check_datetime: str = None):
+    :param check_datetime: the datetime when the habit was checked off ('str'). If no datetime is provided, the
+    current datetime is taken.
+    :return: a tuple ('tuple') containing the completion date ('str') and the completion time ('str')
+    """
+    if check_datetime:
+        check_date, check_time = check_datetime.split(" ")
+        return check_date, check_time
+    now = datetime.now()  # the current date and time are formatted directly instead of being split
+    return now.date().isoformat(), now.time().isoformat(timespec="microseconds")
+
+
+def add_completion(habit, check_datetime: str = None, commit: bool = True):
     """store a new habit completion in the 'Completions' table
 
     :param habit: the habit for which a new completion is to be stored ('habit.HabitDB')
     :param check_datetime: the datetime when the habit was checked off ('str')
+    :param commit: whether the change is to be committed immediately ('bool'). Pass False to commit several changes
+    at once, e.g., within an 'atomic' block.
+    """
+    check_date, check_time = _split_check_datetime(check_datetime)
+    habit_id = find_habit_id(habit)
+    habit.database.execute(_SQL_INSERT_COMPLETION, (habit_id, check_date, check_time))
+    habit._completions = None  # the completion dates loaded with the habit are outdated
+    if commit:
+        habit.database.commit()
+
+
+def add_completions(habit, check_datetimes: list, commit: bool = True):
+    """store several completions of a habit in the 'Completions' table with a single statement
+
+    :param habit: the habit for which the completions are to be stored ('habit.HabitDB')
+    :param check_datetimes: a list ('list') of the datetimes when the habit was checked off ('str')
+    :param commit: whether the change is to be committed immediately ('bool'). Pass False to commit several changes
+    at once, e.g., within an 'atomic' block.
+    """
+    habit_id = find_habit_id(habit)  # the habit id only has to be determined once for all completions
+    completion_rows = [(habit_id, *_split_check_datetime(check_datetime)) for check_datetime in check_datetimes]
+    habit.database.executemany(_SQL_INSERT_COMPLETION, completion_rows)
+    if commit:
+        habit.database.commit()
+    habit._completions = None  # the completion dates loaded with the habit are outdated
+
+
+def seed_completions(habit, start_date: str, count: int, check_time: str = "00:00:00", commit: bool = True):
+    """store completions of a habit on a number of consecutive days with a single statement
+
+    :param habit: the habit for which the completions are to be stored ('habit.HabitDB')
+    :param start_date: the date of the first completion ('str')
+    :param count: the number of consecutive days on which the habit was completed ('int')
+    :param check_time: the time of day when the habit was checked off on each of the days ('str')
+    :param commit: whether the change is to be committed immediately ('bool'). Pass False to commit several changes
+    at once, e.g., within an 'atomic' block.
+    """
+    date.fromisoformat(start_date)  # raises a ValueError for invalid dates, which SQLite would store as NULL
+    if count < 1:  # the recursive query always returns its first day
+        return
+    habit_id = find_habit_id(habit)
+    habit.database.execute(_SQL_SEED_COMPLETIONS, (start_date, count, habit_id, check_time))
+    if commit:
+        habit.database.commit()
+    habit._completions = None  # the completion dates loaded with the habit are outdated
+
+
+def find_longest_streak(habit):
+    """calculate a habit's longest streak (i.e., the maximum number of consecutive periods in a row, in which the
+    habit was completed at least once) in the database. Requires SQLite 3.25 or later.
+
+    :param habit: the habit for which the longest streak is to be calculated ('habit.HabitDB')
+    :return: the habit's longest streak ('int'), 0 if the habit has not been completed yet
     """
-    cursor = habit.database.cursor()
-    if not check_datetime:
-        check_datetime = str(datetime.now())
-    check_date, check_time = check_datetime.split(" ")
     habit_id = find_habit_id(habit)
-    cursor.execute("INSERT INTO Completions(FKHabitID, CompletionDate, CompletionTime) VALUES (?, ?, ?)",
-                   (habit_id, check_date, check_time))
-    habit.database.commit()
+    longest_streak = habit.database.execute(_SQL_LONGEST_STREAK_OF_HABIT, [habit_id]).fetchone()
+    return 0 if not longest_streak else longest_streak[1]
 
 
-def delete_habit(habit):
+def find_longest_streaks(user):
+    """calculate the longest streak of each of a user's habits that have been completed at least once in the
+    database. Requires SQLite 3.25 or later.
+
+    :param user: the user whose habits are to be analyzed ('user.UserDB')
+    :return: a dictionary ('dict') with the habit ids ('int') as keys and the longest streaks ('int') as values
+    """
+    user_id = find_user_id(user)
+    return dict(user.database.execute(_SQL_LONGEST_STREAKS_OF_USER, [user_id]))
+
+
+def delete_habit(habit, commit: bool = True):
     """delete a habit and its corresponding data from the database
 
     :param habit: the habit to be deleted ('habit.HabitDB')
+    :param commit: whether the change is to be committed immediately ('bool'). Pass False to commit several changes
+    at once, e.g., within an 'atomic' block.
     """
     habit_id = find_habit_id(habit)
-    cursor = habit.database.cursor()
-    cursor.execute("DELETE FROM Habit WHERE PKHabitID == ?", [habit_id])
-    habit.database.commit()
+    habit.database.execute(_SQL_DELETE_HABIT, [habit_id])
+    if commit:
+        habit.database.commit()
+    habit._habit_id = None  # the id and the completion dates no longer belong to the habit
+    habit._completions = None
 
 
-def modify_habit(habit, name: str = None, periodicity: str = None):
+def modify_habit(habit, name: str = None, periodicity: str = None, commit: bool = True):
     """modify the habit's name, the habit's periodicity or both in the database
 
     :param habit: the habit to be modified ('habit.HabitDB')
     :param name: the new name of the habit ('str'), if the user wants to change the name
     :param periodicity: the new periodicity of the habit ('str'), if the user wants to change the periodicity
+    :param commit: whether the change is to be committed immediately ('bool'). Pass False to commit several changes
+    at once, e.g., within an 'atomic' block.
     """
+    if not name and not periodicity:
+        return
     habit_id = find_habit_id(habit)
-    cursor = habit.database.cursor()
-    if name:
-        cursor.execute("UPDATE Habit SET Name = ? WHERE PKHabitID == ?", (name, habit_id))
-    if periodicity:
-        cursor.execute("UPDATE Habit SET Periodicity = ? WHERE PKHabitID == ?", (periodicity, habit_id))
-    habit.database.commit()
+    # a value that is not to be changed is passed as NULL, so that the stored value is kept
+    habit.database.execute(_SQL_MODIFY_HABIT, (name or None, periodicity or None, habit_id))
+    if commit:
+        habit.database.commit()
+
+
+@contextmanager
+def atomic(database):
+    """group several changes into a single transaction, which is committed once at the end of the block or rolled
+    back entirely if an error occurs. The changes within the block are to be made with commit=False. The ids of
+    users and habits are only kept on the objects once they have been committed, so that a rollback does not leave
+    the objects with ids that can be assigned to other rows.
+
+    :param database: the database connection in which the changes are made ('sqlite3.connection')
+    :return: a context manager ('contextlib._GeneratorContextManager') which yields the database connection
+    """
+    with database:
+        yield database
 
 
 def check_for_user_data(database):
@@ -161,7 +359,5 @@ def check_for_user_data(database):
     :param database: the database connection which stores the user data ('sqlite3.connection')
     :return: True if data has already been entered, False if not ('bool')
     """
-    cursor = database.cursor()
-    cursor.execute("SELECT * From HabitAppUser")
-    user_data = cursor.fetchall()
-    return True if len(user_data) > 0 else False
+    user_data = database.execute("SELECT 1 FROM HabitAppUser LIMIT 1").fetchone()  # one row is enough
+    return True if user_data else False
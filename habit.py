@@ -12,6 +12,7 @@ class Habit:
                             time frame in which a user wants to complete a habit at least once.
         user ('user.UserDB'): the user who created the habit
     """
+    __slots__ = ("name", "periodicity", "user")  # habits are created in bulk, so they do without an instance dict
 
     def __init__(self, name: str, periodicity: str, user):
         self.name = name
@@ -33,16 +34,18 @@ class HabitDB(Habit):
         user ('user.UserDB'): the user who created the habit
         database ('sqlite3.connection'): the database connection which stores user data
     """
+    __slots__ = ("database", "_habit_id", "_completions")
 
     def __init__(self, name: str, periodicity: str, user):
         Habit.__init__(self, name, periodicity, user)
         self.database = user.database
+        self._habit_id = None  # set once the habit's id in the database is known
+        self._completions = None  # set if the completion dates were loaded together with the habit, reset on changes
 
     @property
     def last_completion(self):
         """the date when the habit was last completed ('str', read-only)"""
-        completions = ana.return_completions(self)
-        return None if not completions else max(completions)
+        return ana.return_last_completion(self)
 
     @property
     def best_streak(self):
@@ -101,13 +104,23 @@ class HabitDB(Habit):
         if name:
             self.name = name
 
-    def analyze_habit(self):
+    def analyze_habit(self, check_dates: list = None):
         """provide a detailed analysis of the habit's data: periodicity, last completion date, longest streak,
         current streak, total breaks, completion rate.
 
+        :param check_dates: the habit's completion dates ('list'), if they have already been retrieved (optional)
         :return: a list of the habit's statistics ('list')
         """
-        data = [self.periodicity, self.last_completion, f"{self.best_streak} period(s)",
-                f"{self.current_streak} period(s)", self.breaks_total]
-        data.append(f"{self.completion_rate} %") if self.periodicity in ["daily", "weekly"] else data.append("---")
+        if check_dates is None:
+            check_dates = ana.return_completions(self)
+        final_periods = ana.return_final_period_starts(self, check_dates)  # determined only once for all statistics
+        best_streak, current_streak, breaks_total = ana.calculate_streak_stats(self, final_periods)
+        last_completion = None if not check_dates else max(check_dates)
+        data = [self.periodicity, last_completion, f"{best_streak} period(s)",
+                f"{current_streak} period(s)", breaks_total]
+        if self.periodicity in ["daily", "weekly"]:
+            completion_rate = round(ana.calculate_completion_rate(self, final_periods) * 100)
+            data.append(f"{completion_rate} %")
+        else:
+            data.append("---")
         return data
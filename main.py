@@ -14,6 +14,7 @@ import db
 from habit import HabitDB
 from user import UserDB
 import analyze as ana
+import pandas as pd
 import questionary as qu
 from validators import HabitNameValidator, UserNameValidator
 from exceptions import UserNameNotExisting
@@ -267,7 +268,8 @@ def analyze_habits(user):
     habit_to_analyze = qu.select("Which habit(s) do you want to analyze?", choices=["All habits"] + habit_names).ask()
     if habit_to_analyze == "All habits":
         habit_comparison, analysis = user.analyze_habits()
-        print(f"""Summary statistics:
+        with pd.option_context("display.max_columns", None):  # to show all columns
+            print(f"""Summary statistics:
         {analysis.to_string(index=False)}
         A detailed comparison of all habits:
         {habit_comparison}""")
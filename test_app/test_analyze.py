@@ -1,7 +1,9 @@
 from datetime import date, timedelta, datetime
 
 import analyze as ana
+import db
 import test_data
+from habit import HabitDB
 from user import UserDB
 
 
@@ -42,6 +44,21 @@ class TestHabitAnalysis(test_data.DataForTestingPytest):
         habit_completions_books_hg = ana.return_completions(self.books_hg)
         assert habit_completions_books_hg == ["2021-12-02", "2021-12-31"]
 
+    def test_return_last_completion(self):
+        """test if a habit's last completion date is returned correctly"""
+        assert ana.return_last_completion(self.books_hg) == "2021-12-31"
+        assert ana.return_last_completion(self.conjure_hp) is None
+
+    def test_return_user_completions(self):
+        """test if the completion dates of all of a user's habits are returned correctly"""
+        completions_hg = ana.return_user_completions(self.hermione_g)
+        assert len(completions_hg) == 2
+        assert completions_hg[2] == ["2021-12-02", "2021-12-31"]
+        completions_hp = ana.return_user_completions(self.harry_p)
+        assert len(completions_hp[4]) == 20
+        assert completions_hp[8] == []
+        assert ana.return_user_completions(self.ron_w) == {}
+
     def test_return_ordered_periodicities(self):
         """test whether the periodicities of a user's habits are correctly returned and in the correct order"""
         assert ana.return_ordered_periodicities(self.harry_p) == ["daily", "weekly", "monthly", "yearly"]
@@ -76,28 +93,28 @@ class TestHabitAnalysis(test_data.DataForTestingPytest):
         # test calculate_period_starts function
         check_dates_daily = ["2022-01-25", "2022-01-27"]
         periods_daily = ana.calculate_period_starts("daily", check_dates_daily)
-        assert periods_daily == [date(2022, 1, 25), date(2022, 1, 27)]
+        assert periods_daily.tolist() == [date(2022, 1, 25), date(2022, 1, 27)]
 
         check_dates_weekly = [date(2022, 1, 25), date(2022, 1, 20), date(2022, 1, 26)]
         periods_weekly = ana.calculate_period_starts("weekly", check_dates_weekly)
-        assert periods_weekly == [date(2022, 1, 24), date(2022, 1, 17), date(2022, 1, 24)]
+        assert periods_weekly.tolist() == [date(2022, 1, 24), date(2022, 1, 17), date(2022, 1, 24)]
 
         check_dates_monthly = ["2022-01-15", "2021-12-14"]
         periods_monthly = ana.calculate_period_starts("monthly", check_dates_monthly)
-        assert periods_monthly == [date(2022, 1, 1), date(2021, 12, 1)]
+        assert periods_monthly.tolist() == [date(2022, 1, 1), date(2021, 12, 1)]
 
         check_dates_yearly = [date(2021, 6, 1), date(2020, 5, 30)]
         periods_yearly = ana.calculate_period_starts("yearly", check_dates_yearly)
-        assert periods_yearly == [date(2021, 1, 1), date(2020, 1, 1)]
+        assert periods_yearly.tolist() == [date(2021, 1, 1), date(2020, 1, 1)]
 
         # test tidy_starts function
         tidy_starts_weekly = ana.tidy_starts(periods_weekly)
-        assert tidy_starts_weekly == [date(2022, 1, 17), date(2022, 1, 24)]
+        assert tidy_starts_weekly.tolist() == [date(2022, 1, 17), date(2022, 1, 24)]
 
         # test add_future_period function
         future_period = ana.calculate_one_period_start("weekly", date.today() + timedelta(weeks=2))
-        assert ana.add_future_period(tidy_starts_weekly, "weekly") == [date(2022, 1, 17), date(2022, 1, 24),
-                                                                       future_period]
+        future_periods_weekly = ana.add_future_period(tidy_starts_weekly, "weekly")
+        assert future_periods_weekly.tolist() == [date(2022, 1, 17), date(2022, 1, 24), future_period]
 
         # test return_final_period_starts function
         final_periods_hedwig = ana.return_final_period_starts(self.hedwig_hp)
@@ -113,30 +130,35 @@ class TestHabitAnalysis(test_data.DataForTestingPytest):
         """test if it is possible to calculate a habit's break indices correctly"""
         # test calculate_element_diffs function
         dates = [date(2021, 7, 3), date(2021, 7, 9), date(2021, 7, 10), date(2021, 8, 10)]
-        assert ana.calculate_element_diffs(dates) == [timedelta(days=6), timedelta(days=1), timedelta(days=31)]
+        assert ana.calculate_element_diffs(dates).tolist() == [timedelta(days=6), timedelta(days=1), timedelta(days=31)]
 
         # test calculate break_indices function
         final_periods_hedwig = ana.return_final_period_starts(self.hedwig_hp)
         final_periods_ginny = ana.return_final_period_starts(self.ginny_hp)
         final_periods_malfoy = ana.return_final_period_starts(self.malfoy_hp)
         final_periods_voldemort = ana.return_final_period_starts(self.kill_voldemort_hp)
-        assert ana.calculate_break_indices(final_periods_hedwig, "daily") == [4, 25, 28, 29, 32, 34]
-        assert ana.calculate_break_indices(final_periods_ginny, "weekly") == [4, 7, 10]
-        assert ana.calculate_break_indices(final_periods_malfoy, "monthly") == [1, 7]
-        assert ana.calculate_break_indices(final_periods_voldemort, "yearly") == [1]
+        assert ana.calculate_break_indices(final_periods_hedwig, "daily").tolist() == [4, 25, 28, 29, 32, 34]
+        assert ana.calculate_break_indices(final_periods_ginny, "weekly").tolist() == [4, 7, 10]
+        assert ana.calculate_break_indices(final_periods_malfoy, "monthly").tolist() == [1, 7]
+        assert ana.calculate_break_indices(final_periods_voldemort, "yearly").tolist() == [1]
 
     def test_calculate_longest_streak(self):
         """test if the a habit's longest streak is calculated correctly"""
         # test calculate_streak_lengths function
-        assert ana.calculate_streak_lengths(self.hedwig_hp) == [5, 21, 3, 1, 3, 2]
-        assert ana.calculate_streak_lengths(self.ginny_hp) == [5, 3, 3]
-        assert ana.calculate_streak_lengths(self.malfoy_hp) == [2, 6]
-        assert ana.calculate_streak_lengths(self.kill_voldemort_hp) == [2]
+        assert ana.calculate_streak_lengths(self.hedwig_hp).tolist() == [5, 21, 3, 1, 3, 2]
+        assert ana.calculate_streak_lengths(self.ginny_hp).tolist() == [5, 3, 3]
+        assert ana.calculate_streak_lengths(self.malfoy_hp).tolist() == [2, 6]
+        assert ana.calculate_streak_lengths(self.kill_voldemort_hp).tolist() == [2]
 
         # test calculate_longest_streak function
         assert ana.calculate_longest_streak(self.hedwig_hp) == 21
         assert ana.calculate_longest_streak(self.kill_voldemort_hp) == 2
 
+        # test that already determined final period starts can be passed in
+        final_periods_hedwig = ana.return_final_period_starts(self.hedwig_hp)
+        assert ana.calculate_longest_streak(self.hedwig_hp, final_periods_hedwig) == 21
+        assert ana.calculate_break_no(self.hedwig_hp, final_periods_hedwig) == 6
+
     def test_calculate_longest_streak_of_all(self):
         """test if the longest streak of all habits of a user is calculated correctly"""
         # test habit_creator function
@@ -171,6 +193,60 @@ class TestHabitAnalysis(test_data.DataForTestingPytest):
         longest_streak_all_rw = ana.calculate_longest_streak_of_all(habits_rw_data)
         assert longest_streak_all_rw == (None, None)
 
+    def test_longest_streak_without_window_functions(self, monkeypatch):
+        """test that the longest streaks calculated in Python (used if SQLite does not support window functions) match
+        those calculated by the database"""
+        weekly_habit = HabitDB("Visit Hagrid", "weekly", self.ron_w)
+        monthly_habit = HabitDB("Write to Charlie", "monthly", self.ron_w)
+        db.add_habits([weekly_habit, monthly_habit], "2021-10-01 10:00:00.000000")
+        db.add_completions(weekly_habit, ["2021-12-26 10:00:00.000000", "2021-12-27 10:00:00.000000",
+                                          "2022-01-17 10:00:00.000000", "2022-01-18 10:00:00.000000"])
+        db.add_completions(monthly_habit, ["2021-06-30 10:00:00.000000", "2021-07-01 10:00:00.000000",
+                                           "2021-09-30 10:00:00.000000", "2021-10-01 10:00:00.000000",
+                                           "2021-11-30 10:00:00.000000"])
+        habit_lists = [ana.habit_creator(user) for user in [self.harry_p, self.hermione_g, self.ron_w]]
+        habit_lists.append([self.hedwig_hp, self.ginny_hp, self.malfoy_hp, self.kill_voldemort_hp, self.conjure_hp])
+        for habits in habit_lists:
+            completed_habits = ana.find_completed_habits(habits)
+            streaks_per_habit = ana.calculate_longest_streak_per_habit(completed_habits)
+            streaks = [ana.calculate_longest_streak(habit) for habit in habits]
+            monkeypatch.setattr(db, "WINDOW_FUNCTIONS_AVAILABLE", False)
+            assert ana.calculate_longest_streak_per_habit(completed_habits) == streaks_per_habit
+            assert [ana.calculate_longest_streak(habit) for habit in habits] == streaks
+            monkeypatch.undo()
+        assert ana.calculate_longest_streak_per_habit(ana.habit_creator(self.ron_w)) == {"Visit Hagrid": 2,
+                                                                                         "Write to Charlie": 3}
+        for window_functions_available in [True, False]:  # a habit without completions has no streak on both paths
+            monkeypatch.setattr(db, "WINDOW_FUNCTIONS_AVAILABLE", window_functions_available)
+            assert ana.calculate_longest_streak_per_habit([self.conjure_hp, self.hedwig_hp]) == {"Conjuring": 0,
+                                                                                                   "Feed Hedwig": 21}
+
+    def test_habit_creator_completions(self):
+        """test if the completion dates loaded together with the habits match those stored in the database"""
+        _, books_hg = ana.habit_creator(self.hermione_g)
+        assert ana.return_completions(books_hg) == ["2021-12-02", "2021-12-31"]
+        assert ana.return_last_completion(ana.habit_creator(self.harry_p)[-1]) is None  # 'Conjuring'
+        books_hg.check_off_habit("2022-01-03 10:00:00.000000")  # the loaded completion dates are outdated then
+        assert ana.return_completions(books_hg) == ["2021-12-02", "2021-12-31", "2022-01-03"]
+        assert ana.return_last_completion(books_hg) == "2022-01-03"
+
+    def test_analysis_of_loaded_habits(self):
+        """test that the analysis of habits created by habit_creator uses the loaded completion dates instead of
+        querying them again"""
+        habits_hp = ana.habit_creator(self.harry_p)
+        statements = []
+        self.database.set_trace_callback(statements.append)
+        completed_habits_hp = ana.find_completed_habits(habits_hp)
+        completion_rates = ana.calculate_completion_rate_per_habit(completed_habits_hp)
+        analysis = ana.analyze_all_habits(habits_hp)
+        longest_streaks = [ana.calculate_longest_streak(habit) for habit in habits_hp]
+        self.database.set_trace_callback(None)
+        assert statements == []
+        assert longest_streaks == [db.find_longest_streak(habit) for habit in habits_hp]
+        assert len(completed_habits_hp) == 5
+        assert list(completion_rates) == ["Feed Hedwig", "Meet Ginny", "Train Quidditch"]
+        assert list(analysis.columns) == [habit.name for habit in completed_habits_hp]
+
     def test_completed_in_period(self):
         """test if it is possible to check if a habit was completed in the current or the previous period"""
         final_periods_hedwig_hp = ana.return_final_period_starts(self.hedwig_hp)
@@ -192,6 +268,18 @@ class TestHabitAnalysis(test_data.DataForTestingPytest):
         assert ana.calculate_curr_streak(self.books_hg) == 1
         assert ana.calculate_curr_streak(self.malfoy_hp) == 6
 
+    def test_calculate_streak_stats(self):
+        """test if a habit's longest streak, current streak and number of breaks are calculated together correctly"""
+        assert ana.calculate_streak_stats(self.hedwig_hp) == (21, 0, 6)
+        assert ana.calculate_streak_stats(self.ginny_hp) == (5, 3, 2)
+        assert ana.calculate_streak_stats(self.quidditch_hp) == (3, 0, 3)
+
+    def test_calculate_streak_stats_without_completions(self):
+        """test that a habit which has not been completed yet has no streaks and no breaks"""
+        assert ana.calculate_streak_stats(self.conjure_hp) == (0, 0, 0)
+        assert self.conjure_hp.current_streak == 0
+        assert self.conjure_hp.breaks_total == 0
+
     def test_calculate_completion_rate(self):
         """test if a habit's completion rate is calculated correctly (only daily & weekly habits)"""
         assert ana.calculate_completion_rate(self.hedwig_hp) == 6 / 28
@@ -237,6 +325,10 @@ class TestHabitAnalysis(test_data.DataForTestingPytest):
         assert lowest_completion_rate_hg == 0.25
         assert worst_habit_hg == ["Study", "Read books"]
 
+        # test that no completion rate is returned if there are no completed daily or weekly habits
+        assert ana.calculate_worst_completion_rate_of_all([self.malfoy_hp, self.kill_voldemort_hp]) == (None, None)
+        assert ana.calculate_worst_completion_rate_of_all([]) == (None, None)
+
     def test_analyze_all_habits(self):
         """test if the dataframes to analyze all habits are built correctly"""
         habit_list_hp = ana.habit_creator(self.harry_p)
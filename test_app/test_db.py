@@ -1,5 +1,12 @@
+import sqlite3
+
+import pytest
+
+import analyze as ana
 import db
 import test_data
+from habit import HabitDB
+from user import UserDB
 import os
 
 
@@ -24,15 +31,151 @@ class TestDB(test_data.DataForTestingPytest):
         """test whether data was added to the 'HabitAppUser' table"""
         assert len(self.retrieve_data("HabitAppUser")) == 4
 
+    def test_unique_username(self):
+        """test that a username cannot be stored twice"""
+        with pytest.raises(sqlite3.IntegrityError):
+            db.add_user(UserDB("HarryP", self.database))
+        assert len(self.retrieve_data("HabitAppUser")) == 4
+
+    def test_bulk_inserts(self):
+        """test whether several users, habits and completions can be stored at once"""
+        dean_t = UserDB("DeanT", self.database)
+        seamus_f = UserDB("SeamusF", self.database)
+        db.add_users([dean_t, seamus_f])
+        assert len(self.retrieve_data("HabitAppUser")) == 6
+        football = HabitDB("Play football", "weekly", dean_t)
+        explode = HabitDB("Explode things", "daily", seamus_f)
+        db.add_habits([football, explode], "2022-01-03 10:00:00.000000")
+        assert len(self.retrieve_data("Habit")) == 11
+        db.add_completions(explode, ["2022-01-03 10:00:00.000000", "2022-01-04 11:00:00.000000"])
+        assert len(self.retrieve_data("Completions")) == 81
+        assert db.find_completed_habit_ids(seamus_f) == {11}
+        assert db.find_completed_habit_ids(dean_t) == set()
+
+    def test_unique_indices_with_duplicates(self):
+        """test that a database which already contains duplicate usernames or habit names can still be opened"""
+        old_database = sqlite3.connect(":memory:")
+        old_database.executescript("""
+        CREATE TABLE HabitAppUser (PKUserID INTEGER PRIMARY KEY, UserName TEXT);
+        CREATE TABLE Habit (PKHabitID INTEGER PRIMARY KEY, FKUserID INTEGER, Name TEXT, Periodicity TEXT,
+        CreationTime TIMESTAMP);
+        INSERT INTO HabitAppUser(UserName) VALUES ('HarryP'), ('HarryP');
+        INSERT INTO Habit(FKUserID, Name, Periodicity) VALUES (1, 'Feed Hedwig', 'daily'), (1, 'Feed Hedwig', 'daily');
+        """)
+        db.create_tables(old_database)
+        indices = dict(old_database.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index'"))
+        assert indices["idx_username"].startswith("CREATE INDEX")  # the index is created without the constraint
+        assert indices["idx_habit_user_name"].startswith("CREATE INDEX")
+        assert indices["idx_completion_habit"].startswith("CREATE INDEX")
+        assert self.database.execute("SELECT sql FROM sqlite_master WHERE name = 'idx_username'").fetchone()[0] \
+            .startswith("CREATE UNIQUE INDEX")
+
+    def test_lookup_indices(self):
+        """test whether users, habits and completions are looked up via the indices instead of a table scan"""
+        lookups = {"idx_username": "SELECT PKUserID FROM HabitAppUser WHERE UserName = 'HarryP'",
+                   "idx_habit_user_name": "SELECT PKHabitID FROM Habit WHERE Name = 'Study' AND FKUserID = 2",
+                   "idx_completion_habit": "SELECT CompletionDate FROM Completions WHERE FKHabitID = 1"}
+        cursor = self.database.cursor()
+        for index, query in lookups.items():
+            cursor.execute(f"EXPLAIN QUERY PLAN {query}")
+            assert index in " ".join(row[-1] for row in cursor.fetchall())
+
+    def test_atomic(self):
+        """test whether several changes are committed together or not at all"""
+        neville_l = UserDB("NevilleL", self.database)
+        herbology = HabitDB("Herbology", "weekly", neville_l)
+        with db.atomic(self.database):
+            db.add_user(neville_l, commit=False)
+            db.add_habit(herbology, "2022-01-03 10:00:00.000000", commit=False)
+            db.add_completion(herbology, "2022-01-04 10:00:00.000000", commit=False)
+        assert not self.database.in_transaction
+        assert len(self.retrieve_data("Completions")) == 80
+        with pytest.raises(sqlite3.IntegrityError):
+            with db.atomic(self.database):
+                db.modify_habit(herbology, name="Care for Mandrakes", commit=False)
+                db.add_user(UserDB("NevilleL", self.database), commit=False)  # the username already exists
+        assert self.retrieve_data("Habit")[-1][2] == "Herbology"
+        with pytest.raises(RuntimeError):  # the bulk functions do not commit the enclosing transaction either
+            with db.atomic(self.database):
+                db.add_users([UserDB("LunaL", self.database)], commit=False)
+                db.add_habits([HabitDB("Read Quibbler", "weekly", self.ron_w)], commit=False)
+                db.add_completions(herbology, ["2022-01-05 10:00:00.000000"], commit=False)
+                db.seed_completions(herbology, "2022-01-06", 3, commit=False)
+                raise RuntimeError
+        assert len(self.retrieve_data("HabitAppUser")) == 5
+        assert len(self.retrieve_data("Habit")) == 10
+        assert len(self.retrieve_data("Completions")) == 80
+
+    def test_seed_completions(self):
+        """test whether completions on consecutive days can be stored at once"""
+        db.seed_completions(self.conjure_hp, "2021-12-30", 4)
+        assert ana.return_completions(self.conjure_hp) == ["2021-12-30", "2021-12-31", "2022-01-01", "2022-01-02"]
+        assert db.find_longest_streak(self.conjure_hp) == 4
+        db.seed_completions(self.conjure_hp, "2022-01-03", 0)  # no completions are stored
+        assert len(ana.return_completions(self.conjure_hp)) == 4
+        with pytest.raises(ValueError):
+            db.seed_completions(self.conjure_hp, "2022-13-01", 2)
+        assert len(ana.return_completions(self.conjure_hp)) == 4
+
+    def test_find_longest_streaks(self):
+        """test whether the longest streaks calculated in the database match those calculated in Python"""
+        for user in [self.harry_p, self.hermione_g, self.ron_w, self.voldemort]:
+            completed_habits = [habit for habit in user.defined_habits if habit.last_completion]
+            longest_streaks = {db.find_habit_id(habit): ana.calculate_streak_stats(habit)[0]
+                               for habit in completed_habits}
+            assert db.find_longest_streaks(user) == longest_streaks
+        assert db.find_longest_streak(self.hedwig_hp) == 21
+        assert db.find_longest_streak(self.kill_voldemort_hp) == 2
+        assert db.find_longest_streak(self.conjure_hp) == 0
+
     def test_find_user_id(self):
         """test whether the correct user ID is returned"""
         assert db.find_user_id(self.harry_p) == 1
         assert db.find_user_id(self.voldemort) == 4
+        assert db.find_user_id(UserDB("Voldemort", self.database)) == 4  # a new object for the same user
+        second_database = db.get_db(":memory:")
+        db.add_user(UserDB("Dumbledore", second_database))
+        db.add_user(UserDB("Voldemort", second_database))
+        assert db.find_user_id(UserDB("Voldemort", second_database)) == 2  # the id depends on the database
+
+    def test_find_user_id_after_rollback(self):
+        """test that a user id found within a transaction that was rolled back is not reused"""
+        with pytest.raises(RuntimeError):
+            with db.atomic(self.database):
+                db.add_user(UserDB("NevilleL", self.database), commit=False)
+                assert db.find_user_id(UserDB("NevilleL", self.database)) == 5
+                raise RuntimeError
+        db.add_user(UserDB("LunaL", self.database))
+        db.add_user(UserDB("NevilleL", self.database))
+        assert db.find_user_id(UserDB("NevilleL", self.database)) == 6
+
+    def test_find_habit_id_after_rollback(self):
+        """test that a habit which was stored within a transaction that was rolled back does not keep its id"""
+        herbology = HabitDB("Herbology", "weekly", self.ron_w)
+        with pytest.raises(RuntimeError):
+            with db.atomic(self.database):
+                db.add_habit(herbology, commit=False)
+                db.add_completion(herbology, "2022-01-04 10:00:00.000000", commit=False)
+                raise RuntimeError
+        assert herbology._habit_id is None
+        chess = HabitDB("Play chess", "daily", self.ron_w)
+        db.add_habit(chess)  # gets the id that was assigned to Herbology within the transaction
+        db.add_habit(herbology)
+        db.add_completion(herbology, "2022-01-05 10:00:00.000000")
+        assert ana.return_completions(chess) == []
+        assert ana.return_completions(herbology) == ["2022-01-05"]
+        for habit in [chess, herbology]:
+            habit_name = self.database.execute("SELECT Name FROM Habit WHERE PKHabitID = ?",
+                                               [db.find_habit_id(habit)]).fetchone()[0]
+            assert habit_name == habit.name
 
     def test_find_habit_id(self):
         """test whether the correct habit ID is returned"""
         assert db.find_habit_id(self.study_hg) == 1
         assert db.find_habit_id(self.ginny_hp) == 4
+        assert db.find_habit_id(HabitDB("Meet Ginny", "weekly", self.harry_p)) == 4  # looked up in the database
+        self.ginny_hp.modify_habit(name="Date Ginny")
+        assert db.find_habit_id(self.ginny_hp) == 4
 
     def test_habit_table_db(self):
         """test whether data was added to the 'Habit' table and whether the correct user_id is stored"""
@@ -52,6 +195,12 @@ class TestDB(test_data.DataForTestingPytest):
         habit_id = cursor.fetchone()[0]
         assert habit_id == 3
 
+    def test_find_completed_habit_ids(self):
+        """test whether the ids of all of a user's habits with at least one completion are returned"""
+        assert db.find_completed_habit_ids(self.harry_p) == {3, 4, 5, 6, 7}
+        assert db.find_completed_habit_ids(self.hermione_g) == {1, 2}
+        assert db.find_completed_habit_ids(self.voldemort) == set()
+
     def test_user_data_existing(self):
         """test whether it is possible to check if user data is already existing"""
         second_database = db.get_db(":memory:")
@@ -53,6 +53,9 @@ class TestHabitUser(test_data.DataForTestingPytest):
         assert "Correct Ron" in self.hermione_g.habit_names
         self.quidditch_hp.modify_habit(name="Train Flying")
         assert "Train Flying" in self.harry_p.habit_names
+        assert "Train Quidditch" not in self.harry_p.habit_names
+        periodicities = {habit.name: habit.periodicity for habit in self.harry_p.defined_habits}
+        assert periodicities["Train Flying"] == "weekly"  # the periodicity was kept
 
     def test_analyze_habit(self):
         """test that a habit's statistics are calculated correctly"""
@@ -120,3 +123,8 @@ class TestHabitUser(test_data.DataForTestingPytest):
         strong.store_habit()
         assert hulk.lowest_completion_rate == "---"
         assert hulk.worst_habit == "---"
+
+        # test that the lowest completion rate is not calculated if the user's daily habits have not been completed
+        run = HabitDB("Run", "daily", hulk)
+        run.store_habit()
+        assert hulk.lowest_completion_rate == "---"
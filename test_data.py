@@ -1,11 +1,81 @@
 import os
-from datetime import timedelta, datetime
 
 import db
 from habit import HabitDB
 from user import UserDB
 
 
+# the test data as an SQL script, so that it can be stored with a single call and within a single transaction. The
+# users and habits are referred to by their names, so that the script does not depend on the ids assigned by the
+# database. Dates relative to the current date are determined by the database, the completions are inserted in the
+# same order as the tests expect them to be returned (except for the 21-day streak of Feed Hedwig, which is stored
+# separately).
+SEED_SQL = """
+BEGIN;
+INSERT INTO HabitAppUser(UserName) VALUES ('HarryP'), ('HermioneG'), ('RonW'), ('Voldemort');
+INSERT INTO Habit(FKUserID, Name, Periodicity, CreationTime) SELECT u.PKUserID, h.column2, h.column3, h.column4
+FROM (VALUES
+('HermioneG', 'Study', 'daily', datetime('now', 'localtime')),
+('HermioneG', 'Read books', 'weekly', datetime('now', 'localtime')),
+('HarryP', 'Feed Hedwig', 'daily', '2021-11-30 07:54:24.999098'),
+('HarryP', 'Meet Ginny', 'weekly', '2021-10-31 07:54:24.999098'),
+('HarryP', 'Tease Malfoy', 'monthly', '2021-10-31 07:54:24.999098'),
+('HarryP', 'Train Quidditch', 'weekly', '2022-10-31 07:56:24.999098'),
+('HarryP', 'Kill Voldemort', 'yearly', '2022-10-31 07:56:24.999098'),
+('HarryP', 'Conjuring', 'daily', datetime('now', 'localtime')),
+('Voldemort', 'Kill Harry', 'daily', datetime('now', 'localtime'))) h
+CROSS JOIN HabitAppUser u ON u.UserName = h.column1;  -- with CROSS JOIN, SQLite keeps the order of the values
+INSERT INTO Completions(FKHabitID, CompletionDate, CompletionTime) SELECT h.PKHabitID, c.column3, c.column4
+FROM (VALUES
+('HermioneG', 'Study', date('now', 'localtime'), time('now', 'localtime')),
+('HermioneG', 'Study', '2021-12-02', '07:56:24.999098'),
+('HermioneG', 'Read books', '2021-12-02', '07:56:24.999098'),
+('HermioneG', 'Read books', '2021-12-31', '07:56:24.999098'),
+('HarryP', 'Feed Hedwig', '2021-12-01', '07:56:24.999098'), ('HarryP', 'Feed Hedwig', '2021-12-01', '09:56:24.999098'),
+('HarryP', 'Feed Hedwig', '2021-12-02', '07:56:24.999098'), ('HarryP', 'Feed Hedwig', '2021-12-02', '07:56:24.999098'),
+('HarryP', 'Feed Hedwig', '2021-12-02', '07:56:24.999098'), ('HarryP', 'Feed Hedwig', '2021-12-04', '07:56:24.999098'),
+('HarryP', 'Feed Hedwig', '2021-12-05', '07:56:24.999098'),
+('HarryP', 'Feed Hedwig', '2021-12-29', '07:56:24.999098'), ('HarryP', 'Feed Hedwig', '2021-12-30', '07:56:24.999098'),
+('HarryP', 'Feed Hedwig', '2021-12-31', '07:56:24.999098'),
+('HarryP', 'Feed Hedwig', date('now', 'localtime', '-16 days'), time('now', 'localtime')),
+('HarryP', 'Feed Hedwig', date('now', 'localtime', '-8 days'), time('now', 'localtime')),
+('HarryP', 'Feed Hedwig', date('now', 'localtime', '-7 days'), time('now', 'localtime')),
+('HarryP', 'Feed Hedwig', date('now', 'localtime', '-10 days'), time('now', 'localtime')),
+('HarryP', 'Feed Hedwig', date('now', 'localtime', '-11 days'), time('now', 'localtime')),
+('HarryP', 'Feed Hedwig', date('now', 'localtime', '-12 days'), time('now', 'localtime')),
+('HarryP', 'Meet Ginny', '2021-11-06', '07:56:24.999098'), ('HarryP', 'Meet Ginny', '2021-11-07', '07:56:24.999098'),
+('HarryP', 'Meet Ginny', '2021-11-11', '07:56:24.999098'), ('HarryP', 'Meet Ginny', '2021-11-13', '07:56:24.999098'),
+('HarryP', 'Meet Ginny', '2021-11-14', '07:56:24.999098'), ('HarryP', 'Meet Ginny', '2021-11-21', '07:56:24.999098'),
+('HarryP', 'Meet Ginny', '2021-11-25', '07:56:24.999098'), ('HarryP', 'Meet Ginny', '2021-11-27', '07:56:24.999098'),
+('HarryP', 'Meet Ginny', '2021-11-28', '07:56:24.999098'), ('HarryP', 'Meet Ginny', '2021-12-02', '07:56:24.999098'),
+('HarryP', 'Meet Ginny', '2021-12-04', '07:56:24.999098'), ('HarryP', 'Meet Ginny', '2021-12-05', '07:56:24.999098'),
+('HarryP', 'Meet Ginny', '2021-12-16', '07:56:24.999098'), ('HarryP', 'Meet Ginny', '2021-12-18', '07:56:24.999098'),
+('HarryP', 'Meet Ginny', '2021-12-19', '07:56:24.999098'), ('HarryP', 'Meet Ginny', '2021-12-30', '07:56:24.999098'),
+('HarryP', 'Meet Ginny', date('now', 'localtime', '-7 days'), time('now', 'localtime')),
+('HarryP', 'Meet Ginny', date('now', 'localtime', '-14 days'), time('now', 'localtime')),
+('HarryP', 'Train Quidditch', '2021-11-06', '07:56:24.999098'),
+('HarryP', 'Train Quidditch', '2021-11-13', '07:56:24.999098'),
+('HarryP', 'Train Quidditch', '2021-11-20', '07:56:24.999098'),
+('HarryP', 'Train Quidditch', '2021-12-04', '07:56:24.999098'),
+('HarryP', 'Train Quidditch', '2021-12-11', '07:56:24.999098'),
+('HarryP', 'Train Quidditch', '2021-12-18', '07:56:24.999098'),
+('HarryP', 'Train Quidditch', '2022-01-01', '07:56:24.999098'),
+('HarryP', 'Tease Malfoy', '2021-06-23', '07:56:24.999098'), ('HarryP', 'Tease Malfoy', '2021-07-06', '07:56:24.999098'),
+('HarryP', 'Tease Malfoy', '2021-09-15', '07:56:24.999098'), ('HarryP', 'Tease Malfoy', '2021-10-02', '07:56:24.999098'),
+('HarryP', 'Tease Malfoy', '2021-11-17', '07:56:24.999098'), ('HarryP', 'Tease Malfoy', '2021-12-30', '07:56:24.999098'),
+('HarryP', 'Tease Malfoy', '2022-01-30', '07:56:24.999098'),
+('HarryP', 'Tease Malfoy', date('now', 'localtime'), time('now', 'localtime')),
+('HarryP', 'Kill Voldemort', '2022-01-05', '07:56:24.999098'),
+('HarryP', 'Kill Voldemort', '2021-12-05', '07:56:24.999098'),
+('HarryP', 'Feed Hedwig', '2021-12-03', '07:56:24.999098'),
+('HarryP', 'Meet Ginny', '2021-12-21', '07:56:24.999098'),
+('HarryP', 'Meet Ginny', date('now', 'localtime'), time('now', 'localtime'))) c
+CROSS JOIN HabitAppUser u ON u.UserName = c.column1
+CROSS JOIN Habit h ON h.FKUserID = u.PKUserID AND h.Name = c.column2;
+COMMIT;
+"""
+
+
 class DataForTesting:
     """This class creates test data for the application that can be used to the test the application's
     functionality at runtime or using pytest. It provides four test users with a total of nine test habits.
@@ -42,13 +112,6 @@ class DataForTesting:
         self.ron_w = UserDB("RonW", database)
         self.voldemort = UserDB("Voldemort", database)
 
-    def store_users(self):
-        """store the test users in the database"""
-        db.add_user(self.harry_p)
-        db.add_user(self.hermione_g)
-        db.add_user(self.ron_w)
-        db.add_user(self.voldemort)
-
     def create_habits(self):
         """create the test users' habits"""
         self.study_hg = HabitDB("Study", "daily", self.hermione_g)
@@ -61,117 +124,14 @@ class DataForTesting:
         self.conjure_hp = HabitDB("Conjuring", "daily", self.harry_p)
         self.kill_harry_v = HabitDB("Kill Harry", "daily", self.voldemort)
 
-    def store_habits(self):
-        """store the test users' habits in the database"""
-        db.add_habit(self.study_hg)
-        db.add_habit(self.books_hg)
-        db.add_habit(self.hedwig_hp, "2021-11-30 07:54:24.999098")
-        db.add_habit(self.ginny_hp, "2021-10-31 07:54:24.999098")
-        db.add_habit(self.malfoy_hp, "2021-10-31 07:54:24.999098")
-        db.add_habit(self.quidditch_hp, "2022-10-31 07:56:24.999098")
-        db.add_habit(self.kill_voldemort_hp, "2022-10-31 07:56:24.999098")
-        db.add_habit(self.conjure_hp)
-        db.add_habit(self.kill_harry_v)
-
-    def store_habit_completions(self):
-        """store completion data for the test habits"""
-        db.add_completion(self.study_hg)
-        db.add_completion(self.study_hg, "2021-12-02 07:56:24.999098")
-
-        db.add_completion(self.books_hg, "2021-12-02 07:56:24.999098")
-        db.add_completion(self.books_hg, "2021-12-31 07:56:24.999098")
-
-        db.add_completion(self.hedwig_hp, "2021-12-01 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-01 09:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-02 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-02 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-02 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-04 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-05 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-07 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-08 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-09 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-10 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-11 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-12 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-13 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-14 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-15 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-16 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-17 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-18 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-19 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-20 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-21 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-22 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-23 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-24 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-25 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-26 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-27 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-29 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-30 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, "2021-12-31 07:56:24.999098")
-        db.add_completion(self.hedwig_hp, str(datetime.now() - timedelta(weeks=2, days=2)))
-        db.add_completion(self.hedwig_hp, str(datetime.now() - timedelta(weeks=1, days=1)))
-        db.add_completion(self.hedwig_hp, str(datetime.now() - timedelta(weeks=1)))
-        db.add_completion(self.hedwig_hp, str(datetime.now() - timedelta(weeks=1, days=3)))
-        db.add_completion(self.hedwig_hp, str(datetime.now() - timedelta(weeks=1, days=4)))
-        db.add_completion(self.hedwig_hp, str(datetime.now() - timedelta(weeks=1, days=5)))
-
-        db.add_completion(self.ginny_hp, "2021-11-06 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-11-07 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-11-11 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-11-13 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-11-14 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-11-21 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-11-25 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-11-27 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-11-28 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-12-02 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-12-04 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-12-05 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-12-16 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-12-18 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-12-19 07:56:24.999098")
-        db.add_completion(self.ginny_hp, "2021-12-30 07:56:24.999098")
-        db.add_completion(self.ginny_hp, str(datetime.now() - timedelta(weeks=1)))
-        db.add_completion(self.ginny_hp, str(datetime.now() - timedelta(weeks=2)))
-
-        db.add_completion(self.quidditch_hp, "2021-11-06 07:56:24.999098")
-        db.add_completion(self.quidditch_hp, "2021-11-13 07:56:24.999098")
-        db.add_completion(self.quidditch_hp, "2021-11-20 07:56:24.999098")
-        db.add_completion(self.quidditch_hp, "2021-12-04 07:56:24.999098")
-        db.add_completion(self.quidditch_hp, "2021-12-11 07:56:24.999098")
-        db.add_completion(self.quidditch_hp, "2021-12-18 07:56:24.999098")
-        db.add_completion(self.quidditch_hp, "2022-01-01 07:56:24.999098")
-
-        db.add_completion(self.malfoy_hp, "2021-06-23 07:56:24.999098")
-        db.add_completion(self.malfoy_hp, "2021-07-06 07:56:24.999098")
-        db.add_completion(self.malfoy_hp, "2021-09-15 07:56:24.999098")
-        db.add_completion(self.malfoy_hp, "2021-10-02 07:56:24.999098")
-        db.add_completion(self.malfoy_hp, "2021-11-17 07:56:24.999098")
-        db.add_completion(self.malfoy_hp, "2021-12-30 07:56:24.999098")
-        db.add_completion(self.malfoy_hp, "2022-01-30 07:56:24.999098")
-        db.add_completion(self.malfoy_hp)
-
-        db.add_completion(self.kill_voldemort_hp, "2022-01-05 07:56:24.999098")
-        db.add_completion(self.kill_voldemort_hp, "2021-12-05 07:56:24.999098")
-
-        db.add_completion(self.hedwig_hp, "2021-12-03 07:56:24.999098")
-
-        db.add_completion(self.ginny_hp, "2021-12-21 07:56:24.999098")
-        db.add_completion(self.ginny_hp)
-
     def create_test_data(self, database):
         """create all test data (i.e., users, habits, and habit completions) for the application
 
         :param database: the database connection in which the test data is to be stored ('sqlite3.connection')"""
         self.create_users(database)
-        self.store_users()
         self.create_habits()
-        self.store_habits()
-        self.store_habit_completions()
+        database.executescript(SEED_SQL)  # stores all users, habits and completions at once
+        db.seed_completions(self.hedwig_hp, "2021-12-07", 21, "07:56:24.999098")  # the 21-day streak of Feed Hedwig
 
 
 class DataForTestingPytest(DataForTesting):
@@ -180,13 +140,28 @@ class DataForTestingPytest(DataForTesting):
     pytest.
 
     Attributes:
-        database (sqlite3.connection): the test database which stores the test data.
+        template_database (sqlite3.connection): the database in which the test data is stored once per test class.
+        database (sqlite3.connection): the test database which stores a copy of the test data for a single test.
         additional attributes: see the documentation of the DataForTesting class
     """
+    @classmethod
+    def setup_class(cls):
+        """create the test data once for all tests of the class and save it in a template database"""
+        cls.template_database = db.get_db(":memory:")  # creates the database only in memory
+        cls().create_test_data(cls.template_database)
+
+    @classmethod
+    def teardown_class(cls):
+        """close the template database"""
+        cls.template_database.close()
+
     def setup_method(self):
-        """create the database connection, create the test data and save it in the database"""
-        self.database = db.get_db(":memory:")  # creates the database only in memory
-        self.create_test_data(self.database)
+        """create the database connection and copy the test data from the template database into it, so that every
+        test works on its own data"""
+        self.database = db.get_db(":memory:")
+        self.template_database.backup(self.database)
+        self.create_users(self.database)
+        self.create_habits()
 
 
 class DataForTestingCLI(DataForTesting):
@@ -28,6 +28,7 @@ class UserDB(User):
     def __init__(self, username: str, database):
         User.__init__(self, username)
         self.database = database
+        self._user_id = None  # set once the user's id in the database is known
 
     @property
     def defined_habits(self):
@@ -64,13 +65,11 @@ class UserDB(User):
         """the value of the lowest completion rate of all habits. The completion rate is defined as
         the percentage of time periods in the last four weeks (full weeks for weekly habits) in which the
         habit was completed at least once."""
-        user_periodicities = ana.return_ordered_periodicities(self)
-        if "daily" in user_periodicities or "weekly" in user_periodicities:  # the completion rate is only calculated
-            # for daily and weekly habits
-            lowest_completion_rate, _ = ana.calculate_worst_completion_rate_of_all(self.completed_habits)
-            return round((lowest_completion_rate*100))
-        else:
+        lowest_completion_rate, _ = ana.calculate_worst_completion_rate_of_all(self.completed_habits)
+        if lowest_completion_rate is None:  # the completion rate is only calculated for daily and weekly habits
             return "---"
+        else:
+            return round((lowest_completion_rate*100))
 
     @property
     def worst_habit(self):